@@ -6,14 +6,24 @@ Optimized for Windows packaging, compatible with macOS
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import PIL
 from PIL import Image, ImageTk, ImageOps
 import os
 import sys
 import json
+import math
 import platform
+import queue
 import logging
+import threading
 from pathlib import Path
 
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # OpenCV is optional; Pillow handles the preview resize
+    cv2 = None
+
 # Configure logging for debugging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +32,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Pillow-SIMD is pinned to the Pillow 9 API, which may lack the Resampling enum
+RESAMPLING = getattr(Image, "Resampling", Image)
+TRANSPOSE = getattr(Image, "Transpose", Image)
+
+# Fit-mode letterbox (mode, colour), picked once per image from its alpha
+FIT_FILL_ALPHA = ("RGBA", (255, 255, 255, 0))
+FIT_FILL_OPAQUE = ("RGB", (255, 255, 255))
+
+# EXIF orientation tag value -> transpose that restores the upright image
+_EXIF_OPS = {
+    2: TRANSPOSE.FLIP_LEFT_RIGHT,
+    3: TRANSPOSE.ROTATE_180,
+    4: TRANSPOSE.FLIP_TOP_BOTTOM,
+    5: TRANSPOSE.TRANSPOSE,
+    6: TRANSPOSE.ROTATE_270,
+    7: TRANSPOSE.TRANSVERSE,
+    8: TRANSPOSE.ROTATE_90,
+}
+
 class ImageResizerApp:
     def __init__(self, root):
         self.root = root
@@ -53,20 +82,52 @@ class ImageResizerApp:
         self.RECENT_FILES_PATH = Path.home() / ".image_resizer_recent.json"
         self.MAX_RECENT = 5
         self.SUPPORTED_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.webp', '.tiff', '.tif', '.gif'}
+        self.PREVIEW_BG = "#2b2b2b"
+        self.THUMB_SIZE = 48
         
         # State variables
         self.filepath = None
         self.original_image = None
         self.processed_image = None
+        self._processed_key = None
+        self._preview_source = None  # (original, reduced copy) pair
         self.tk_image = None
+        self._tk_image_mode = None
         self.resize_mode = tk.StringVar(value="fit")
         self.aspect_locked = tk.BooleanVar(value=True)  # Default to locked
         self.preserve_exif = tk.BooleanVar(value=True)
+        self.optimize_output = tk.BooleanVar(value=False)
+        self._fit_fill = FIT_FILL_OPAQUE
         self.orig_width = 0
         self.orig_height = 0
-        self.aspect_ratio = 1.0
+        self._ar_num, self._ar_den = 1, 1  # reduced width:height ratio
         self.mode_desc_widgets = []
+        self._recent = []
+        self._recent_missing = set()
+        self._recent_dirty = False
+        self._thumb_cache = {}  # (path, mtime, oriented) -> PhotoImage, None if unreadable
+        self._thumb_current = {}  # path -> key of its latest thumbnail
+        self._thumb_pending = set()
         self._preview_job = None
+        self._preview_gen = 0
+        self._load_gen = 0
+        # Cheap kernel for the interactive preview, LANCZOS for saved output
+        self._preview_filter = RESAMPLING.BILINEAR
+        self._final_filter = RESAMPLING.LANCZOS
+        self._save_queue = queue.Queue()
+        self._batch_total = 0
+        self._batch_done = 0
+        self._batch_failed = 0
+        self._batch_reserved = set()  # sources and outputs of queued batch jobs
+        
+        # Mode dispatch is rebound in on_mode_change, keeping Tcl out of the hot path
+        self._mode_impls = {
+            "fit": self._process_fit,
+            "cut": self._process_cut,
+            "stretch": self._process_stretch,
+        }
+        self._mode_key = self.resize_mode.get()
+        self._mode_impl = self._mode_impls[self._mode_key]
         
         # Setup UI
         self.setup_styles()
@@ -79,6 +140,11 @@ class ImageResizerApp:
         self.status_var = tk.StringVar(value="Pronto")
         self.status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.progress = ttk.Progressbar(root, mode='determinate')
+        
+        # Batch workers: Pillow releases the GIL while decoding, resizing and encoding
+        for _ in range(os.cpu_count() or 1):
+            threading.Thread(target=self._save_worker, daemon=True).start()
         
         # Process command line arguments (for files opened via drag-drop to icon)
         self.root.after(100, self.process_argv)
@@ -89,6 +155,7 @@ class ImageResizerApp:
         style.configure("TButton", padding=6)
         style.configure("TLabelframe", padding=10)
         style.configure("Header.TLabel", font=("Helvetica", 10, "bold"))
+        style.configure("Recent.Treeview", rowheight=self.THUMB_SIZE + 4)
         
     def setup_ui(self):
         # Main container
@@ -178,6 +245,7 @@ class ImageResizerApp:
         opt_frame = ttk.LabelFrame(left_frame, text="Opzioni", padding=10)
         opt_frame.pack(fill=tk.X, pady=(0, 10))
         ttk.Checkbutton(opt_frame, text="Correggi rotazione EXIF", variable=self.preserve_exif).pack(anchor=tk.W)
+        ttk.Checkbutton(opt_frame, text="Ottimizza (più lento)", variable=self.optimize_output).pack(anchor=tk.W)
         
         # Recent files
         recent_frame = ttk.LabelFrame(left_frame, text="Recenti", padding=10)
@@ -189,12 +257,13 @@ class ImageResizerApp:
         scrollbar = ttk.Scrollbar(list_container)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.recent_listbox = tk.Listbox(list_container, height=5, activestyle="none", 
-                                        yscrollcommand=scrollbar.set)
-        self.recent_listbox.pack(fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.recent_listbox.yview)
+        self.recent_tree = ttk.Treeview(list_container, show="tree", selectmode="browse", height=5,
+                                        style="Recent.Treeview", yscrollcommand=scrollbar.set)
+        self.recent_tree.tag_configure("missing", foreground="gray")
+        self.recent_tree.pack(fill=tk.BOTH, expand=True)
+        scrollbar.config(command=self.recent_tree.yview)
         
-        self.recent_listbox.bind('<Double-Button-1>', self.on_recent_select)
+        self.recent_tree.bind('<Double-Button-1>', self.on_recent_select)
         
         # Right panel
         right_frame = ttk.Frame(main_paned)
@@ -214,10 +283,13 @@ class ImageResizerApp:
         self.canvas_frame = ttk.Frame(right_frame, relief="sunken", borderwidth=1)
         self.canvas_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.canvas = tk.Canvas(self.canvas_frame, bg="#2b2b2b", highlightthickness=0)
+        self.canvas = tk.Canvas(self.canvas_frame, bg=self.PREVIEW_BG, highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
         self.canvas.bind('<Button-1>', lambda e: self.load_image())
         
+        # Single persistent image item; updates only change its image and position
+        self._canvas_item = self.canvas.create_image(0, 0, anchor=tk.NW, tags="image")
+        
         self.update_placeholder()
         
     def setup_menu(self):
@@ -241,7 +313,8 @@ class ImageResizerApp:
             self.root.bind('<Control-o>', lambda e: self.load_image())
             self.root.bind('<Control-s>', lambda e: self.save_image())
             
-        self.root.bind('<Escape>', lambda e: self.root.quit())
+        self.root.bind('<Escape>', lambda e: self.quit_app())
+        self.root.protocol('WM_DELETE_WINDOW', self.quit_app)
         self.root.bind('<Configure>', self.on_window_resize)
         
     def process_argv(self):
@@ -272,7 +345,10 @@ class ImageResizerApp:
         self._preview_job = self.root.after(150, self.update_preview)
         
     def update_placeholder(self):
-        self.canvas.delete("all")
+        self.canvas.delete("placeholder")
+        if self.original_image:
+            return
+            
         w = self.canvas.winfo_width()
         h = self.canvas.winfo_height()
         
@@ -282,7 +358,12 @@ class ImageResizerApp:
             
         text = "Clicca per aprire un'immagine"
         self.canvas.create_text(w//2, h//2, text=text, fill="#888888", 
-                               font=("Helvetica", 14), justify=tk.CENTER)
+                               font=("Helvetica", 14), justify=tk.CENTER, tags="placeholder")
+        
+    @staticmethod
+    def scale_dimension(value, num, den):
+        """value * num / den rounded to nearest, so width/height edits don't drift"""
+        return max(1, (value * num * 2 + den) // (2 * den))
         
     def on_dim_change(self, source):
         """Update dimensions with aspect ratio lock"""
@@ -293,11 +374,11 @@ class ImageResizerApp:
             try:
                 if source == "width":
                     w = int(self.entry_width.get())
-                    new_h = int(w / self.aspect_ratio)
+                    new_h = self.scale_dimension(w, self._ar_den, self._ar_num)
                     self.entry_height.set(str(new_h))
                 else:
                     h = int(self.entry_height.get())
-                    new_w = int(h * self.aspect_ratio)
+                    new_w = self.scale_dimension(h, self._ar_num, self._ar_den)
                     self.entry_width.set(str(new_w))
             except (ValueError, ZeroDivisionError):
                 pass
@@ -308,10 +389,13 @@ class ImageResizerApp:
         self._preview_job = self.root.after(100, self.update_preview)
         
     def on_mode_change(self):
+        self._mode_key = self.resize_mode.get()
+        self._mode_impl = self._mode_impls[self._mode_key]
+        
         for val, desc in self.mode_desc_widgets:
             desc.pack_forget()
         for val, desc in self.mode_desc_widgets:
-            if val == self.resize_mode.get():
+            if val == self._mode_key:
                 desc.pack(anchor=tk.W, padx=20, pady=(0, 5))
                 break
         self.update_preview()
@@ -320,7 +404,7 @@ class ImageResizerApp:
         if self.aspect_locked.get() and self.original_image:
             try:
                 w = int(self.entry_width.get())
-                h = int(w * self.aspect_ratio)
+                h = self.scale_dimension(w, self._ar_den, self._ar_num)
                 self.entry_height.set(str(h))
                 self.update_preview()
             except ValueError:
@@ -349,45 +433,81 @@ class ImageResizerApp:
             return None, None
             
     def apply_exif_orientation(self, img):
-        """Apply EXIF rotation if present"""
+        """Apply EXIF orientation (all 8 cases, including mirrored ones)"""
         try:
-            exif = img._getexif()
-            if exif:
-                orientation = exif.get(274)
-                if orientation == 3:
-                    img = img.rotate(180, expand=True)
-                elif orientation == 6:
-                    img = img.rotate(270, expand=True)
-                elif orientation == 8:
-                    img = img.rotate(90, expand=True)
-        except:
-            pass
-        return img
+            orientation = img.getexif().get(0x0112)
+        except Exception:
+            return img
+        op = _EXIF_OPS.get(orientation)
+        # FLIP_LEFT_RIGHT is 0, so test against None
+        return img.transpose(op) if op is not None else img
             
     def load_image(self, filepath=None):
         if not filepath:
-            filepath = filedialog.askopenfilename(
+            filepaths = filedialog.askopenfilenames(
                 filetypes=[
                     ("Image Files", "*.png;*.jpg;*.jpeg;*.bmp;*.webp;*.tiff;*.tif;*.gif"),
                     ("All Files", "*.*")
                 ]
             )
+            if len(filepaths) > 1:
+                self.batch_images(filepaths)
+                return
+            filepath = filepaths[0] if filepaths else None
             
         if not filepath:
             return
             
         filepath = Path(filepath)
+        self._load_gen += 1
+        self.status_var.set(f"Caricamento: {filepath.name}")
+        threading.Thread(
+            target=self._bg_load,
+            args=(filepath, self.preserve_exif.get(), self._load_gen),
+            daemon=True
+        ).start()
+        
+    def open_image(self, filepath, fix_orientation):
+        img = Image.open(filepath)
+        if fix_orientation:
+            img = self.apply_exif_orientation(img)
+        # Normalise palette images once instead of on every preview
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        # Decode now so preview threads never race on the lazy load
+        img.load()
+        return img
         
+    def _bg_load(self, filepath, fix_orientation, gen):
+        """Decode the image off the Tk thread"""
         try:
-            self.original_image = Image.open(filepath)
-            self.filepath = filepath
+            img = self.open_image(filepath, fix_orientation)
+        except Exception as e:
+            self.root.after(0, self._load_failed, e, gen)
+            return
+            
+        self.root.after(0, self._apply_loaded, filepath, img, gen)
+        
+    def _load_failed(self, error, gen):
+        if gen != self._load_gen:
+            return
+        messagebox.showerror("Errore", f"Impossibile caricare:\\n{str(error)}")
+        self.status_var.set("Errore di caricamento")
+        
+    def _apply_loaded(self, filepath, img, gen):
+        if gen != self._load_gen:
+            return
             
-            # Apply EXIF rotation
-            if self.preserve_exif.get():
-                self.original_image = self.apply_exif_orientation(self.original_image)
+        try:
+            self.original_image = img
+            self._fit_fill = FIT_FILL_ALPHA if img.mode == 'RGBA' else FIT_FILL_OPAQUE
+            self._preview_source = None
+            self._processed_key = None
+            self.filepath = filepath
             
             self.orig_width, self.orig_height = self.original_image.size
-            self.aspect_ratio = self.orig_width / self.orig_height if self.orig_height else 1.0
+            g = math.gcd(self.orig_width, self.orig_height) or 1
+            self._ar_num, self._ar_den = self.orig_width // g, self.orig_height // g
             
             self.file_label.config(text=filepath.name, foreground="black")
             self.dims_label.config(text=f"Originali: {self.orig_width} × {self.orig_height}")
@@ -398,7 +518,7 @@ class ImageResizerApp:
             self.add_recent_file(str(filepath))
             self.save_btn.config(state=tk.NORMAL)
             
-            self.canvas.delete("all")
+            self.canvas.delete("placeholder")
             self.update_preview()
             self.status_var.set(f"Caricato: {filepath.name}")
             
@@ -406,40 +526,78 @@ class ImageResizerApp:
             messagebox.showerror("Errore", f"Impossibile caricare:\\n{str(e)}")
             self.status_var.set("Errore di caricamento")
             
-    def process_image(self, target_w, target_h):
-        if not self.original_image:
-            return None
+    def update_preview_source(self, original, target_w, target_h, canvas_w, canvas_h):
+        """Return a reduced copy of original large enough for the preview"""
+        orig_w, orig_h = original.size
+        box_w = 2 * max(canvas_w, target_w)
+        box_h = 2 * max(canvas_h, target_h)
+        scale = min(max(box_w / orig_w, box_h / orig_h), 1.0)
+        
+        cached = self._preview_source
+        if cached is not None and cached[0] is original:
+            cached_scale = cached[1].width / orig_w
+            # Rebuild only when too small, or more than twice as large as needed
+            if scale <= cached_scale <= scale * 2:
+                return cached[1]
+                
+        if scale >= 1.0:
+            source = original
+        else:
+            size = (math.ceil(orig_w * scale), math.ceil(orig_h * scale))
+            source = original.resize(size, self._preview_filter, reducing_gap=2.0)
             
-        mode = self.resize_mode.get()
-        img = self.original_image.copy()
+        self._preview_source = (original, source)
+        return source
         
-        if mode == "stretch":
-            return img.resize((target_w, target_h), Image.Resampling.LANCZOS)
-            
-        elif mode == "cut":
-            return ImageOps.fit(img, (target_w, target_h), method=Image.Resampling.LANCZOS)
+    def process_image(self, target_w, target_h, source=None, mode=None, resample=None, fill=None):
+        if not self.original_image:
+            return None
             
-        elif mode == "fit":
-            orig_w, orig_h = img.size
-            scale = min(target_w/orig_w, target_h/orig_h)
+        impl = self._mode_impl if mode is None else self._mode_impls[mode]
+        if resample is None:
+            resample = self._final_filter
+        if fill is None:
+            fill = self._fit_fill
+        img = source if source is not None else self.original_image
+        return impl(img, target_w, target_h, resample, fill)
+        
+    @staticmethod
+    def _process_stretch(img, target_w, target_h, resample, fill):
+        return img.resize((target_w, target_h), resample)
+        
+    @staticmethod
+    def _process_cut(img, target_w, target_h, resample, fill):
+        return ImageOps.fit(img, (target_w, target_h), method=resample)
+        
+    @staticmethod
+    def _process_fit(img, target_w, target_h, resample, fill):
+        orig_w, orig_h = img.size
+        scale = min(target_w/orig_w, target_h/orig_h)
+        
+        if scale >= 1:
+            new_w, new_h = orig_w, orig_h
+        else:
+            new_w = int(orig_w * scale)
+            new_h = int(orig_h * scale)
             
-            if scale >= 1:
-                new_w, new_h = orig_w, orig_h
-            else:
-                new_w = int(orig_w * scale)
-                new_h = int(orig_h * scale)
-                
-            resized = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+        if scale < 0.5:
+            # Box-reduce large downscales before the final resampling pass
+            resized = img.resize((new_w, new_h), resample, reducing_gap=2.0)
+        else:
+            resized = img.resize((new_w, new_h), resample)
             
-            if img.mode in ('RGBA', 'P'):
-                background = Image.new("RGBA", (target_w, target_h), (255, 255, 255, 0))
-            else:
-                background = Image.new("RGB", (target_w, target_h), (255, 255, 255))
-                
-            offset = ((target_w - new_w) // 2, (target_h - new_h) // 2)
-            background.paste(resized, offset)
-            return background
+        fill_mode, fill_color = fill
+        
+        # Same aspect as the target: no letterbox to allocate and paste into,
+        # as long as the output keeps the letterbox mode (RGB or RGBA)
+        if (new_w, new_h) == (target_w, target_h) and resized.mode == fill_mode:
+            return resized
             
+        background = Image.new(fill_mode, (target_w, target_h), fill_color)
+        offset = ((target_w - new_w) // 2, (target_h - new_h) // 2)
+        background.paste(resized, offset)
+        return background
+        
     def update_preview(self):
         if not self.original_image:
             return
@@ -448,53 +606,114 @@ class ImageResizerApp:
         if not w or not h:
             return
             
-        try:
-            processed = self.process_image(w, h)
-            if not processed:
-                return
-                
-            self.processed_image = processed
+        canvas_w = self.canvas.winfo_width()
+        canvas_h = self.canvas.winfo_height()
+        
+        if canvas_w < 50 or canvas_h < 50:
+            self.root.after(100, self.update_preview)
+            return
             
-            canvas_w = self.canvas.winfo_width()
-            canvas_h = self.canvas.winfo_height()
+        # Unchanged output settings (e.g. window resize): only refit to the canvas
+        key = (w, h, self._mode_key, id(self.original_image))
+        processed = self.processed_image if key == self._processed_key else None
+        
+        # Newer requests supersede in-flight ones; stale results are dropped
+        self._preview_gen += 1
+        threading.Thread(
+            target=self._bg_preview,
+            args=(self.original_image, self._fit_fill, w, h, self._mode_key, canvas_w, canvas_h,
+                  key, processed, self._preview_gen),
+            daemon=True
+        ).start()
+        
+    def _bg_preview(self, original, fill, w, h, mode, canvas_w, canvas_h, key, processed, gen):
+        """Render the preview off the Tk thread (Pillow releases the GIL while resizing)"""
+        # Bail out between the expensive steps once a newer request exists
+        if gen != self._preview_gen:
+            return
             
-            if canvas_w < 50 or canvas_h < 50:
-                self.root.after(100, self.update_preview)
-                return
-                
+        try:
+            if processed is None:
+                source = self.update_preview_source(original, w, h, canvas_w, canvas_h)
+                if gen != self._preview_gen:
+                    return
+                processed = self.process_image(w, h, source=source, mode=mode,
+                                               resample=self._preview_filter, fill=fill)
+                if not processed or gen != self._preview_gen:
+                    return
+                    
             img_w, img_h = processed.size
-            scale = min(canvas_w/img_w, canvas_h/img_h, 1.0)
-            
-            preview_w = int(img_w * scale)
-            preview_h = int(img_h * scale)
             
-            if scale < 1.0:
-                display_img = processed.resize((preview_w, preview_h), Image.Resampling.LANCZOS)
-            else:
+            if img_w <= canvas_w and img_h <= canvas_h:
                 display_img = processed
+            else:
+                # Scale by the tighter side, compared and applied in integers
+                if canvas_w * img_h < canvas_h * img_w:
+                    scale_num, scale_den = canvas_w, img_w
+                else:
+                    scale_num, scale_den = canvas_h, img_h
+                preview_w = max(1, img_w * scale_num // scale_den)
+                preview_h = max(1, img_h * scale_num // scale_den)
                 
-            if display_img.mode == 'RGBA':
-                display_img = display_img.convert('RGB')
+                if cv2 is not None and processed.mode in ('L', 'RGB', 'RGBA'):
+                    # INTER_AREA is a SIMD box filter tuned for downscaling
+                    arr = cv2.resize(np.asarray(processed), (preview_w, preview_h), interpolation=cv2.INTER_AREA)
+                    display_img = Image.fromarray(arr)
+                else:
+                    display_img = processed.resize((preview_w, preview_h), self._preview_filter)
+                    
+            # Tk photos only take 1/L/RGB/RGBA; reduce others (e.g. F, I;16, CMYK) to their base mode
+            if display_img.mode not in ('1', 'L', 'RGB', 'RGBA'):
+                display_img = display_img.convert('L' if Image.getmodebase(display_img.mode) == 'L' else 'RGB')
                 
-            self.tk_image = ImageTk.PhotoImage(display_img)
+        except Exception as e:
+            self.root.after(0, self.status_var.set, f"Errore anteprima: {str(e)}")
+            return
             
-            x = (canvas_w - preview_w) // 2
-            y = (canvas_h - preview_h) // 2
+        self.root.after(0, self._apply_preview, processed, display_img, w, h, mode, key, gen)
+        
+    def _apply_preview(self, processed, display_img, w, h, mode, key, gen):
+        if gen != self._preview_gen:
+            return
             
-            self.canvas.delete("all")
-            self.canvas.create_image(x, y, anchor=tk.NW, image=self.tk_image, tags="image")
+        self.processed_image = processed
+        self._processed_key = key
+        
+        try:
+            canvas_w = self.canvas.winfo_width()
+            canvas_h = self.canvas.winfo_height()
             
-            mode_str = self.resize_mode.get().upper()
-            self.preview_info.config(text=f"Output: {w}×{h} [{mode_str}]")
+            # The PhotoImage matches the preview size and is repainted in place,
+            # so pixels go straight into Tk without a canvas-sized staging copy
+            # Greyscale stays L; everything else is shown as RGB (alpha dropped, as before)
+            tk_mode = 'L' if Image.getmodebase(display_img.mode) == 'L' else 'RGB'
+            if (self.tk_image is None or self._tk_image_mode != tk_mode
+                    or self.tk_image.width() != display_img.width
+                    or self.tk_image.height() != display_img.height):
+                self.tk_image = ImageTk.PhotoImage(mode=tk_mode, size=display_img.size)
+                self._tk_image_mode = tk_mode
+                self.canvas.itemconfig(self._canvas_item, image=self.tk_image)
+            self.tk_image.paste(display_img)
+            
+            x = (canvas_w - display_img.width) // 2
+            y = (canvas_h - display_img.height) // 2
+            self.canvas.coords(self._canvas_item, x, y)
+            
+            self.preview_info.config(text=f"Output: {w}×{h} [{mode.upper()}]")
             
         except Exception as e:
             self.status_var.set(f"Errore anteprima: {str(e)}")
             
     def save_image(self):
-        if not self.processed_image:
+        if not self.original_image:
             messagebox.showwarning("Attenzione", "Nessuna immagine da salvare")
             return
             
+        w, h = self.get_dimensions()
+        if not w or not h:
+            messagebox.showwarning("Attenzione", "Dimensioni non valide")
+            return
+            
         if self.filepath:
             default_name = self.filepath.stem + "_resized"
         else:
@@ -517,30 +736,9 @@ class ImageResizerApp:
             
         try:
             save_path = Path(save_path)
-            img = self.processed_image.copy()
-            ext = save_path.suffix.lower()
-            
-            save_kwargs = {}
-            
-            if ext in ('.jpg', '.jpeg'):
-                if img.mode in ('RGBA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    if img.mode == 'RGBA':
-                        background.paste(img, mask=img.split()[3])
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                save_kwargs = {'quality': 95, 'optimize': True}
-                
-            elif ext == '.png':
-                save_kwargs = {'optimize': True}
-                
-            elif ext == '.webp':
-                save_kwargs = {'quality': 95}
-                
-            img.save(save_path, **save_kwargs)
+            # The preview is built from a reduced copy; render from the original
+            img = self.process_image(w, h, source=self.original_image, resample=self._final_filter)
+            self.write_image(img, save_path, self.optimize_output.get())
             
             self.add_recent_file(str(save_path))
             self.status_var.set(f"Salvato: {save_path.name}")
@@ -550,65 +748,230 @@ class ImageResizerApp:
             messagebox.showerror("Errore", f"Impossibile salvare:\\n{str(e)}")
             self.status_var.set("Salvataggio fallito")
             
+    @staticmethod
+    def write_image(img, save_path, optimize):
+        ext = save_path.suffix.lower()
+        save_kwargs = {}
+        
+        if ext in ('.jpg', '.jpeg'):
+            if img.mode in ('RGBA', 'P'):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                if img.mode == 'RGBA':
+                    background.paste(img, mask=img.split()[3])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+            # 4:2:0 baseline without the extra Huffman pass is the fastest libjpeg path
+            save_kwargs = {'quality': 90, 'optimize': optimize, 'subsampling': 2, 'progressive': False}
+            
+        elif ext == '.png':
+            # optimize=True always uses maximum zlib compression; otherwise favour speed
+            save_kwargs = {'optimize': True} if optimize else {'compress_level': 1}
+            
+        elif ext == '.webp':
+            save_kwargs = {'quality': 95}
+            
+        img.save(save_path, **save_kwargs)
+        
+    def batch_images(self, filepaths):
+        """Resize several files with the current settings on the worker threads"""
+        w, h = self.get_dimensions()
+        if not w or not h:
+            messagebox.showwarning("Attenzione", "Dimensioni non valide")
+            return
+            
+        out_dir = filedialog.askdirectory(title="Cartella di destinazione")
+        if not out_dir:
+            return
+            
+        out_dir = Path(out_dir)
+        sources = [Path(f) for f in filepaths]
+        self._batch_reserved.update(src.resolve() for src in sources)
+        
+        settings = (w, h, self._mode_key, self.preserve_exif.get(), self.optimize_output.get())
+        for src in sources:
+            out_path = self.batch_output_path(out_dir, src)
+            self._batch_reserved.add(out_path.resolve())
+            self._save_queue.put((src, out_path) + settings)
+            
+        self._batch_total += len(filepaths)
+        self.progress.config(maximum=self._batch_total, value=self._batch_done)
+        self.progress.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_var.set(f"Elaborazione: {self._batch_done}/{self._batch_total}")
+        
+    def batch_output_path(self, out_dir, src):
+        """Pick an output name that overwrites neither existing files nor queued sources"""
+        out_path = out_dir / f"{src.stem}_resized{src.suffix}"
+        n = 1
+        while out_path.exists() or out_path.resolve() in self._batch_reserved:
+            out_path = out_dir / f"{src.stem}_resized_{n}{src.suffix}"
+            n += 1
+        return out_path
+        
+    def _save_worker(self):
+        """Decode, resize and encode queued batch files"""
+        while True:
+            src, out_path, w, h, mode, fix_orientation, optimize = self._save_queue.get()
+            error = None
+            try:
+                img = self.open_image(src, fix_orientation)
+                fill = FIT_FILL_ALPHA if img.mode == 'RGBA' else FIT_FILL_OPAQUE
+                img = self._mode_impls[mode](img, w, h, self._final_filter, fill)
+                self.write_image(img, out_path, optimize)
+            except Exception as e:
+                error = e
+            self.root.after(0, self._on_batch_progress, src, error)
+            
+    def _on_batch_progress(self, src, error):
+        self._batch_done += 1
+        if error:
+            self._batch_failed += 1
+            logger.error(f"Batch failed for {src}: {error}")
+            
+        self.progress.config(value=self._batch_done)
+        self.status_var.set(f"Elaborazione: {self._batch_done}/{self._batch_total}")
+        
+        if self._batch_done == self._batch_total:
+            status = f"Elaborati {self._batch_total - self._batch_failed} file"
+            if self._batch_failed:
+                status += f", {self._batch_failed} errori"
+            self.status_var.set(status)
+            self.progress.pack_forget()
+            self._batch_total = self._batch_done = self._batch_failed = 0
+            self._batch_reserved.clear()
+            
     def add_recent_file(self, filepath):
+        """Update the in-memory list; it is written to disk on exit"""
+        if filepath in self._recent:
+            self._recent.remove(filepath)
+        self._recent.insert(0, filepath)
+        del self._recent[self.MAX_RECENT:]
+        self._recent_missing.discard(filepath)
+        self._recent_dirty = True
+        # The file may have just been (over)written; drop its thumbnail and re-check
+        self._thumb_cache.pop(self._thumb_current.pop(filepath, None), None)
+        self._refresh_recent_list()
+        
+    def load_recent_files(self):
+        """Read the recent files list and check which entries still exist"""
         try:
             recent = []
             if self.RECENT_FILES_PATH.exists():
                 with open(self.RECENT_FILES_PATH, 'r') as f:
                     recent = json.load(f)
-                    
-            if filepath in recent:
-                recent.remove(filepath)
-            recent.insert(0, filepath)
-            recent = recent[:self.MAX_RECENT]
+            if not isinstance(recent, list):
+                recent = []
+            # Tolerate hand-edited files: strings only, no duplicates
+            self._recent = list(dict.fromkeys(f for f in recent if isinstance(f, str)))[:self.MAX_RECENT]
+            self._recent_missing = {f for f in self._recent if not Path(f).exists()}
+        except:
+            self._recent = []
+            self._recent_missing = set()
             
+        self._refresh_recent_list()
+        
+    def save_recent_files(self):
+        if not self._recent_dirty:
+            return
+        try:
             with open(self.RECENT_FILES_PATH, 'w') as f:
-                json.dump(recent, f)
-                
-            self.load_recent_files()
+                json.dump(self._recent, f)
+            self._recent_dirty = False
         except:
             pass
             
-    def load_recent_files(self):
-        self.recent_listbox.delete(0, tk.END)
-        self.recent_listbox._paths = {}
+    def _refresh_recent_list(self):
+        self.recent_tree.delete(*self.recent_tree.get_children())
         
-        try:
-            if not self.RECENT_FILES_PATH.exists():
-                return
+        # Drop thumbnails of paths that fell off the list
+        for f in list(self._thumb_current):
+            if f not in self._recent:
+                del self._thumb_current[f]
+        for key in [k for k in self._thumb_cache if k[0] not in self._recent]:
+            del self._thumb_cache[key]
                 
-            with open(self.RECENT_FILES_PATH, 'r') as f:
-                recent = json.load(f)
-                
-            for f in recent:
-                path = Path(f)
-                if path.exists():
-                    self.recent_listbox.insert(tk.END, path.name)
-                    self.recent_listbox.itemconfig(tk.END, {'fg': 'black'})
-                    self.recent_listbox._paths[path.name] = f
-                else:
-                    self.recent_listbox.insert(tk.END, f"{path.name} (mancante)")
-                    self.recent_listbox.itemconfig(tk.END, {'fg': 'gray'})
-        except:
-            pass
+        fix_orientation = self.preserve_exif.get()
+        todo = []
+        for f in self._recent:
+            path = Path(f)
+            key = self._thumb_current.get(f)
+            if f in self._recent_missing:
+                self.recent_tree.insert("", tk.END, iid=f, text=f"{path.name} (mancante)", tags=("missing",))
+            elif key is not None and key[2] == fix_orientation:
+                thumb = self._thumb_cache[key]
+                self.recent_tree.insert("", tk.END, iid=f, text=path.name, image=thumb if thumb is not None else "")
+            else:
+                self.recent_tree.insert("", tk.END, iid=f, text=path.name)
+                if f not in self._thumb_pending:
+                    todo.append(f)
+                    
+        if todo:
+            self._thumb_pending.update(todo)
+            threading.Thread(target=self._bg_thumbnails, args=(todo, fix_orientation), daemon=True).start()
+            
+    def _bg_thumbnails(self, paths, fix_orientation):
+        """Build recent-file thumbnails off the Tk thread"""
+        size = self.THUMB_SIZE
+        for f in paths:
+            try:
+                key = (f, os.stat(f).st_mtime, fix_orientation)
+            except OSError:
+                key = (f, None, fix_orientation)
+            if key in self._thumb_cache:
+                self.root.after(0, self._apply_thumbnail, f, key, None, False)
+                continue
                 
+            try:
+                thumb = Image.open(f)
+                # JPEG: let libjpeg decode at 1/2..1/8 scale instead of full size
+                thumb.draft('RGB', (size * 2, size * 2))
+                if fix_orientation:
+                    thumb = self.apply_exif_orientation(thumb)
+                thumb.thumbnail((size, size), RESAMPLING.BILINEAR)
+                if thumb.mode not in ('RGB', 'RGBA'):
+                    thumb = thumb.convert('RGBA')
+            except Exception:
+                # Remembered as None so the file is not reopened until it changes
+                thumb = None
+            self.root.after(0, self._apply_thumbnail, f, key, thumb, True)
+            
+    def _apply_thumbnail(self, f, key, thumb, fresh):
+        self._thumb_pending.discard(f)
+        if f not in self._recent:
+            return
+            
+        if fresh:
+            self._thumb_cache[key] = ImageTk.PhotoImage(thumb) if thumb is not None else None
+        elif key not in self._thumb_cache:
+            return
+            
+        old = self._thumb_current.get(f)
+        if old is not None and old != key:
+            self._thumb_cache.pop(old, None)
+        self._thumb_current[f] = key
+        
+        if self._thumb_cache[key] is not None and self.recent_tree.exists(f):
+            self.recent_tree.item(f, image=self._thumb_cache[key])
+            
     def on_recent_select(self, event):
-        selection = self.recent_listbox.curselection()
+        selection = self.recent_tree.selection()
         if not selection:
             return
             
-        filename = self.recent_listbox.get(selection[0])
-        if "(mancante)" in filename:
+        filepath = selection[0]
+        if filepath in self._recent_missing:
             return
             
-        paths = getattr(self.recent_listbox, '_paths', {})
-        if filename in paths:
-            self.load_image(paths[filename])
+        self.load_image(filepath)
             
     def quit_app(self):
+        self.save_recent_files()
         self.root.quit()
 
 def main():
+    logger.info(f"Pillow {PIL.__version__}")
     root = tk.Tk()
     app = ImageResizerApp(root)
     root.mainloop()